@@ -3,18 +3,40 @@
 """
 Decky EnvTest (Backend)
 Logs game-specific details (provided by the frontend) and pulls Heroic configuration data.
-The debug_log function logs the game info passed from the frontend.
-The pull_heroic_data function loads and parses the Heroic config and library files,
-then filters the library JSON to only return the entry whose "title" matches the provided display name.
+The debug_log function logs the game info passed from the frontend, truncating oversized
+arrays/strings and handing the record to the configured store (daily file, sqlite or an
+in-memory ring); callers get a compact summary and record id.
+The pull_heroic_data function loads the Heroic config (from an mtime-validated cache that is
+warmed in one bulk pass) and parses the library file, then filters the library JSON to only
+return the entry whose "title" matches the provided display name.
 Both are appended to a log file named "log-YYYYMMDD.log" in DECKY_PLUGIN_LOG_DIR (or ~/choochoo).
+The SnapshotScheduler periodically asks the frontend for a fresh game snapshot and logs it
+through debug_log, backing off while nothing changes and staying inside a CPU/IO budget.
 """
 
 import os
+import abc
 import sys
+import copy
 import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+import itertools
+import functools
+import collections
+import concurrent.futures
+import hashlib
 import datetime
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Not on Linux; fall back to an in-process lock.
+    fcntl = None
+
 import decky
 
 logger = decky.logger
@@ -27,45 +49,546 @@ try:
 except Exception as e:
     logger.error(f"Error creating log directory {LOG_DIR}: {e}")
 
+def env_number(name: str, default, cast=float):
+    """Read a numeric setting from the environment, falling back to default if it is malformed."""
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.error(f"Invalid value {raw!r} for {name}, using default {default}.")
+        return default
+
+# Payload limits for debug_log. Longer arrays/strings are cut and marked; 0 disables a limit.
+DEBUG_LOG_MAX_ITEMS = env_number("DECKY_ENVTEST_MAX_ITEMS", 200, int)
+DEBUG_LOG_MAX_STRING = env_number("DECKY_ENVTEST_MAX_STRING", 8192, int)
+DEBUG_LOG_MAX_DEPTH = env_number("DECKY_ENVTEST_MAX_DEPTH", 32, int)
+TRUNCATED_KEY = "__truncated__"
+
+# Storage backend for debug records: "file" (daily log, default), "sqlite" or "memory".
+DEBUG_STORE = os.environ.get("DECKY_ENVTEST_STORE", "file").strip().lower()
+SQLITE_PATH = os.environ.get("DECKY_ENVTEST_SQLITE_PATH", os.path.join(LOG_DIR, "records.sqlite3"))
+SQLITE_BATCH_SIZE = env_number("DECKY_ENVTEST_SQLITE_BATCH_SIZE", 32, int)
+SQLITE_FLUSH_INTERVAL = env_number("DECKY_ENVTEST_SQLITE_FLUSH_INTERVAL", 5.0)
+MEMORY_STORE_SIZE = env_number("DECKY_ENVTEST_MEMORY_SIZE", 256, int)
+QUERY_MAX_LIMIT = 1000
+
+# Heroic per-game config directories: numeric appnames live in the native dir, the rest in the flatpak one.
+HEROIC_NATIVE_CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "Heroic", "GameConfig")
+HEROIC_FLATPAK_CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".var", "app", "com.heroicgameslauncher.hgl",
+                                         "config", "heroic", "GamesConfig")
+HEROIC_CACHE_WORKERS = env_number("DECKY_ENVTEST_HEROIC_CACHE_WORKERS", 4, int)
+
 def get_log_file_path() -> str:
     date_str = datetime.datetime.now().strftime("%Y%m%d")
     return os.path.join(LOG_DIR, f"log-{date_str}.log")
 
+def truncate_payload(value, depth: int = 0):
+    """Return (value, count) where value is bounded by the payload limits and count is the
+    number of arrays/strings/objects that had to be cut."""
+    if isinstance(value, str):
+        if DEBUG_LOG_MAX_STRING and len(value) > DEBUG_LOG_MAX_STRING:
+            return f"{value[:DEBUG_LOG_MAX_STRING]}...[{len(value) - DEBUG_LOG_MAX_STRING} chars truncated]", 1
+        return value, 0
+    if not isinstance(value, (dict, list, tuple)):
+        return value, 0
+    if DEBUG_LOG_MAX_DEPTH and depth >= DEBUG_LOG_MAX_DEPTH:
+        return {TRUNCATED_KEY: f"{type(value).__name__} nested deeper than {DEBUG_LOG_MAX_DEPTH} levels"}, 1
+    count = 0
+    if isinstance(value, dict):
+        out = {}
+        kept = value.items()
+        if DEBUG_LOG_MAX_ITEMS and len(value) > DEBUG_LOG_MAX_ITEMS:
+            kept = itertools.islice(kept, DEBUG_LOG_MAX_ITEMS)
+            count += 1
+        for k, v in kept:
+            out[k], c = truncate_payload(v, depth + 1)
+            count += c
+        if len(out) < len(value):
+            out[TRUNCATED_KEY] = {TRUNCATED_KEY: len(value) - len(out), "total": len(value)}
+        return out, count
+    items = value
+    if DEBUG_LOG_MAX_ITEMS and len(value) > DEBUG_LOG_MAX_ITEMS:
+        items = value[:DEBUG_LOG_MAX_ITEMS]
+        count += 1
+    out = []
+    for v in items:
+        v, c = truncate_payload(v, depth + 1)
+        out.append(v)
+        count += c
+    if len(items) < len(value):
+        out.append({TRUNCATED_KEY: len(value) - len(items), "total": len(value)})
+    return out, count
+
 def collect_debug_data(appid: int, additional_data=None) -> dict:
     data = {
+        "record_id": uuid.uuid4().hex,
         "timestamp": datetime.datetime.now().isoformat(),
         "appid": appid,
         "game_info": additional_data if additional_data is not None else "No game info provided"
     }
     return data
 
-def debug_log(appid: int, extra_data=None) -> str:
+def summarize_record(record: dict, truncated: int, size: int) -> dict:
+    game_info = record["game_info"]
+    return {
+        "record_id": record["record_id"],
+        "timestamp": record["timestamp"],
+        "appid": record["appid"],
+        "keys": sorted(game_info) if isinstance(game_info, dict) else [],
+        "truncated": truncated,
+        "bytes": size,
+    }
+
+class DebugStore(abc.ABC):
+    """Interface for debug record storage. write() returns the number of bytes stored.
+
+    When the caller already needs the indented JSON of a record it passes it as `serialized`,
+    so stores that keep text can reuse it instead of encoding the record again.
+    """
+    name = "base"
+
+    @abc.abstractmethod
+    def write(self, record: dict, serialized: str = None) -> int:
+        ...
+
+    @abc.abstractmethod
+    def query(self, appid=None, since=None, limit: int = 50) -> list:
+        """Return up to `limit` of the newest records, newest first."""
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+_file_lock = threading.Lock()
+
+class _locked:
+    """Hold an advisory flock on an open file (shared or exclusive) for the duration of a block.
+
+    flock locks belong to the open file description, so they serialize threads that open the
+    file separately as well as other processes. Without fcntl only this process is covered.
+    """
+
+    def __init__(self, f, exclusive: bool):
+        self.f = f
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        if fcntl is None:
+            _file_lock.acquire()
+        else:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self.f
+
+    def __exit__(self, *exc):
+        if fcntl is None:
+            _file_lock.release()
+        else:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+
+FILE_WRITE_CHUNK = 64 * 1024
+
+class FileStore(DebugStore):
+    """Appends indented JSON records to the daily log file.
+
+    Records are encoded chunk by chunk straight into the file while an exclusive lock is
+    held, so only a bounded buffer is ever in memory and records from concurrent threads or
+    Decky processes sharing the log dir never interleave. If encoding fails part way the
+    file is truncated back to where the record started.
+    """
+    name = "file"
+
+    def write(self, record: dict, serialized: str = None) -> int:
+        chunks = [serialized] if serialized is not None else json.JSONEncoder(indent=2).iterencode(record)
+        # Unbuffered, so nothing of a failed record can be flushed after the truncate below.
+        with open(get_log_file_path(), "ab", buffering=0) as f, _locked(f, exclusive=True):
+            start = f.seek(0, os.SEEK_END)
+            try:
+                self._write_chunks(f, itertools.chain(chunks, ["\n"]))
+            except BaseException:
+                f.truncate(start)
+                raise
+            return f.tell() - start
+
+    @staticmethod
+    def _write_chunks(f, chunks):
+        pending, size = [], 0
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            pending.append(data)
+            size += len(data)
+            if size >= FILE_WRITE_CHUNK:
+                FileStore._write_all(f, b"".join(pending))
+                pending, size = [], 0
+        if pending:
+            FileStore._write_all(f, b"".join(pending))
+
+    @staticmethod
+    def _write_all(f, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view):]
+
+    def _read_records(self, path: str):
+        """Yield records one at a time; only the record being parsed is held in memory.
+
+        Records are indented JSON objects, so each starts with "{" and ends with "}" at
+        column 0. A new "{" line while a record is still open means the open one was torn.
+        """
+        with open(path, "r", encoding="utf-8") as f, _locked(f, exclusive=False):
+            lines = []
+            for line in f:
+                if line.startswith("{"):
+                    lines = [line]
+                elif lines:
+                    lines.append(line)
+                else:
+                    continue
+                if line.startswith("}"):
+                    record = self._parse_lines(lines)
+                    lines = []
+                    if isinstance(record, dict):
+                        yield record
+
+    @staticmethod
+    def _parse_lines(lines: list):
+        try:
+            return json.loads("".join(lines))
+        except json.JSONDecodeError:
+            pass
+        # A torn record leaves the next record's "{" at the end of its last line; try each
+        # line ending in "{" as that start.
+        for i in range(1, len(lines)):
+            if lines[i].rstrip().endswith("{"):
+                try:
+                    return json.loads("{" + "".join(lines[i + 1:]))
+                except json.JSONDecodeError:
+                    continue
+        return None
+
+    def query(self, appid=None, since=None, limit: int = 50) -> list:
+        try:
+            names = sorted((n for n in os.listdir(LOG_DIR) if n.startswith("log-") and n.endswith(".log")),
+                           reverse=True)
+        except OSError:
+            return []
+        # Daily files are named by date, so files from before `since` can't contain matches.
+        since_day = since[:10].replace("-", "") if isinstance(since, str) else None
+        results = []
+        for name in names:
+            if since_day and name[len("log-"):-len(".log")] < since_day:
+                break
+            # Only the newest `limit` matches of each file are kept.
+            matches = collections.deque(maxlen=limit - len(results))
+            matches.extend(r for r in self._read_records(os.path.join(LOG_DIR, name))
+                           if (appid is None or r.get("appid") == appid)
+                           and (since is None or r.get("timestamp", "") >= since))
+            results.extend(reversed(matches))
+            if len(results) >= limit:
+                break
+        return results
+
+class SqliteStore(DebugStore):
+    """Stores records in sqlite (WAL mode), buffering inserts and committing them in batches."""
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH, batch_size: int = SQLITE_BATCH_SIZE,
+                 flush_interval: float = SQLITE_FLUSH_INTERVAL):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "record_id TEXT PRIMARY KEY, appid INTEGER, timestamp TEXT, body TEXT)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS records_appid_ts ON records (appid, timestamp)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS records_ts ON records (timestamp)")
+        self._conn.commit()
+        # Commit partial batches on a timer so quiet periods don't leave records uncommitted.
+        self._closed = threading.Event()
+        self._flusher = None
+        if self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="envtest-sqlite-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing sqlite store: {e}")
+
+    def write(self, record: dict, serialized: str = None) -> int:
+        body = serialized if serialized is not None else json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._pending.append((record["record_id"], record["appid"], record["timestamp"], body))
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+        return len(body.encode("utf-8"))
+
+    def _flush_locked(self):
+        if self._pending:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def query(self, appid=None, since=None, limit: int = 50) -> list:
+        clauses, params = [], []
+        if appid is not None:
+            clauses.append("appid = ?")
+            params.append(appid)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                f"SELECT body FROM records{where} ORDER BY timestamp DESC LIMIT ?", (*params, limit)).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+class MemoryStore(DebugStore):
+    """Keeps the newest records in a bounded ring buffer; nothing touches the disk."""
+    name = "memory"
+
+    def __init__(self, size: int = MEMORY_STORE_SIZE):
+        self._records = collections.deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+
+    def write(self, record: dict, serialized: str = None) -> int:
+        with self._lock:
+            self._records.append(record)
+        return 0
+
+    def query(self, appid=None, since=None, limit: int = 50) -> list:
+        with self._lock:
+            records = list(self._records)
+        results = []
+        for r in reversed(records):
+            if (appid is None or r.get("appid") == appid) and (since is None or r.get("timestamp", "") >= since):
+                # Copies, so callers can't change the records held in the ring buffer.
+                results.append(copy.deepcopy(r))
+                if len(results) >= limit:
+                    break
+        return results
+
+STORES = {"file": FileStore, "sqlite": SqliteStore, "memory": MemoryStore}
+_store = None
+_store_lock = threading.Lock()
+
+def get_store() -> DebugStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            store_cls = STORES.get(DEBUG_STORE)
+            if store_cls is None:
+                logger.error(f"Unknown debug store {DEBUG_STORE!r}, falling back to file.")
+                store_cls = FileStore
+            try:
+                _store = store_cls()
+            except Exception as e:
+                logger.error(f"Error opening {store_cls.name} store: {e}, falling back to file.")
+                _store = FileStore()
+            logger.info(f"Using {_store.name} store for debug records.")
+        return _store
+
+def close_store():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            try:
+                _store.close()
+            except Exception as e:
+                logger.error(f"Error closing {_store.name} store: {e}")
+            _store = None
+
+def debug_log(appid: int, extra_data=None, full: bool = False) -> dict:
+    """Store one record and return its summary.
+
+    With full=True the summary also carries the serialized record under "log".
+    """
+    extra_data, truncated = truncate_payload(extra_data)
+    return store_record(appid, extra_data, truncated, full=full)
+
+def store_record(appid: int, extra_data, truncated: int, full: bool = False) -> dict:
+    """Like debug_log, for a payload that has already been through truncate_payload."""
     debug_info = collect_debug_data(appid, additional_data=extra_data)
-    written_data = json.dumps(debug_info, indent=2)
-    log_file = get_log_file_path()
+    store = get_store()
+    size = 0
+    serialized = None
     try:
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(written_data + "\n")
-        logger.info(f"Logged game data to {log_file}")
+        # The full body is only built when the caller asked for it; the store then reuses it.
+        if full:
+            serialized = json.dumps(debug_info, indent=2)
+        size = store.write(debug_info, serialized)
+        logger.info(f"Logged game data to {store.name} store (record {debug_info['record_id']}, {size} bytes)")
     except Exception as e:
-        logger.error(f"Error writing to log file {log_file}: {e}")
-    return written_data
+        logger.error(f"Error writing to {store.name} store: {e}")
+    summary = summarize_record(debug_info, truncated, size)
+    if serialized is not None:
+        summary["log"] = serialized
+    return summary
+
+def payload_digest(value) -> str:
+    """Hash value's canonical JSON chunk by chunk, without building the whole string."""
+    digest = hashlib.sha1()
+    for chunk in json.JSONEncoder(sort_keys=True, default=str).iterencode(value):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+def query_debug_records(appid=None, since=None, limit: int = 50) -> list:
+    if limit < 1:
+        raise ValueError(f"limit must be a positive integer, got {limit}")
+    return get_store().query(appid=appid, since=since, limit=min(limit, QUERY_MAX_LIMIT))
+
+def _load_json_file(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class HeroicConfigCache:
+    """Parsed GamesConfig/<appname>.json files keyed by appname, validated by mtime and size.
+
+    warm() fills the cache in one os.scandir pass per directory and parses changed files
+    concurrently; get() then costs a single stat per lookup instead of exists + parse.
+    """
+
+    def __init__(self, native_dir: str = HEROIC_NATIVE_CONFIG_DIR, flatpak_dir: str = HEROIC_FLATPAK_CONFIG_DIR,
+                 workers: int = HEROIC_CACHE_WORKERS):
+        self.native_dir = native_dir
+        self.flatpak_dir = flatpak_dir
+        self.directories = (native_dir, flatpak_dir)
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        # directory -> appname -> (mtime_ns, size, config)
+        self._entries = {d: {} for d in self.directories}
+        self.hits = 0
+        self.misses = 0
+        self.warm_seconds = None
+        self.warmed_at = None
+
+    def directory_for(self, appname: str) -> str:
+        return self.native_dir if appname.isdigit() else self.flatpak_dir
+
+    def warm(self) -> dict:
+        start = time.perf_counter()
+        to_parse = []
+        for directory in self.directories:
+            seen = set()
+            try:
+                it = os.scandir(directory)
+            except FileNotFoundError:
+                it = None
+            except OSError as e:
+                logger.error(f"Error scanning Heroic config dir {directory}: {e}")
+                # Keep what is cached; get() still validates each entry on lookup.
+                continue
+            if it is not None:
+                with it:
+                    for entry in it:
+                        if not entry.name.endswith(".json"):
+                            continue
+                        try:
+                            if not entry.is_file():
+                                continue
+                            st = entry.stat()
+                        except OSError:
+                            # Deleted or unreadable mid-scan; skip it and keep scanning.
+                            continue
+                        appname = entry.name[:-len(".json")]
+                        seen.add(appname)
+                        with self._lock:
+                            cached = self._entries[directory].get(appname)
+                        if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+                            to_parse.append((directory, appname, entry.path, st.st_mtime_ns, st.st_size))
+            with self._lock:
+                for appname in set(self._entries[directory]) - seen:
+                    del self._entries[directory][appname]
+
+        if to_parse:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(_load_json_file, item[2]): item for item in to_parse}
+                for future in concurrent.futures.as_completed(futures):
+                    directory, appname, path, mtime_ns, size = futures[future]
+                    try:
+                        config = future.result()
+                    except Exception as e:
+                        logger.error(f"Error parsing Heroic config {path}: {e}")
+                        continue
+                    with self._lock:
+                        self._entries[directory][appname] = (mtime_ns, size, config)
+
+        with self._lock:
+            self.warm_seconds = time.perf_counter() - start
+            self.warmed_at = datetime.datetime.now().isoformat()
+        stats = self.stats()
+        logger.info(f"Warmed Heroic config cache: {stats['entries']} entries in {stats['warm_seconds']:.3f}s")
+        return stats
+
+    def get(self, appname: str):
+        """Return the parsed config for appname, or None if there is no config file.
+
+        The result is the cached object itself and must be treated as read-only.
+        """
+        directory = self.directory_for(appname)
+        path = os.path.join(directory, f"{appname}.json")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries[directory].pop(appname, None)
+            return None
+        with self._lock:
+            cached = self._entries[directory].get(appname)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                self.hits += 1
+                return cached[2]
+            self.misses += 1
+        config = _load_json_file(path)
+        with self._lock:
+            self._entries[directory][appname] = (st.st_mtime_ns, st.st_size, config)
+        return config
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = [e for d in self._entries.values() for e in d.values()]
+            return {
+                "entries": len(entries),
+                # Size of the source files on disk, not of the parsed objects in memory.
+                "source_bytes": sum(e[1] for e in entries),
+                "warm_seconds": self.warm_seconds,
+                "warmed_at": self.warmed_at,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+heroic_cache = HeroicConfigCache()
 
 def pull_heroic_data(appname: str) -> dict:
     data = {"timestamp": datetime.datetime.now().isoformat(), "appname": appname}
     try:
-        # Determine the path for the Heroic configuration file.
-        if appname.isdigit():
-            config_path = os.path.join(os.path.expanduser("~"), ".config", "Heroic", "GameConfig", f"{appname}.json")
-        else:
-            config_path = os.path.join(os.path.expanduser("~"), ".var", "app", "com.heroicgameslauncher.hgl",
-                                       "config", "heroic", "GamesConfig", f"{appname}.json")
-        if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as f:
-                heroic_config = json.load(f)
-            data["heroic_config"] = heroic_config
-        else:
-            data["heroic_config"] = "Not found"
+        heroic_config = heroic_cache.get(appname)
+        data["heroic_config"] = heroic_config if heroic_config is not None else "Not found"
 
         # Read the Heroic library file.
         lib_path = os.path.join(os.path.expanduser("~"), ".var", "app", "com.heroicgameslauncher.hgl",
@@ -90,26 +613,192 @@ def pull_heroic_data(appname: str) -> dict:
         data["error"] = str(e)
     return data
 
+# Snapshot scheduling. An interval of 0 disables periodic snapshots.
+SNAPSHOT_EVENT = "envtest_snapshot_request"
+SNAPSHOT_INTERVAL = env_number("DECKY_ENVTEST_SNAPSHOT_INTERVAL", 60.0)
+SNAPSHOT_MAX_INTERVAL = env_number("DECKY_ENVTEST_SNAPSHOT_MAX_INTERVAL", 900.0)
+# Budgets are enforced per rolling window: CPU as a fraction of wall time, IO as bytes written.
+SNAPSHOT_BUDGET_WINDOW = env_number("DECKY_ENVTEST_SNAPSHOT_BUDGET_WINDOW", 3600.0)
+SNAPSHOT_CPU_BUDGET = env_number("DECKY_ENVTEST_SNAPSHOT_CPU_BUDGET", 0.005)
+SNAPSHOT_IO_BUDGET = env_number("DECKY_ENVTEST_SNAPSHOT_IO_BUDGET", 16 * 1024 * 1024, int)
+# InstalledApps is the costly part of a snapshot for the Steam client; periodic snapshots skip
+# it unless this is set to 1, and cap it at DEBUG_LOG_MAX_ITEMS entries when included.
+SNAPSHOT_INSTALLED_APPS = bool(env_number("DECKY_ENVTEST_SNAPSHOT_INSTALLED_APPS", 0, int))
+
+class SnapshotScheduler:
+    def __init__(self, interval=SNAPSHOT_INTERVAL, max_interval=SNAPSHOT_MAX_INTERVAL,
+                 cpu_budget=SNAPSHOT_CPU_BUDGET, io_budget=SNAPSHOT_IO_BUDGET,
+                 budget_window=SNAPSHOT_BUDGET_WINDOW):
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.cpu_budget = cpu_budget
+        self.io_budget = io_budget
+        self.budget_window = budget_window
+        self.delay = interval
+        self._task = None
+        self._lock = threading.Lock()
+        self._last_digest = None
+        # Set when a request has been emitted and cleared once the frontend answers it.
+        self._awaiting = False
+        self._window_start = time.monotonic()
+        self._cpu_used = 0.0
+        self._io_used = 0
+
+    def start(self):
+        if self.interval <= 0:
+            logger.info("[backend] Periodic snapshots disabled.")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"[backend] Periodic snapshots every {self.interval}s (max {self.max_interval}s).")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            with self._lock:
+                delay = self.delay
+            await asyncio.sleep(delay)
+            with self._lock:
+                # An unanswered request (e.g. no game running) counts as "nothing changed".
+                if self._awaiting:
+                    self._back_off()
+                over_budget = self._over_budget()
+                self._awaiting = not over_budget
+            if over_budget:
+                logger.debug("[backend] Snapshot budget exhausted, skipping request.")
+                continue
+            try:
+                await decky.emit(SNAPSHOT_EVENT, {"installed_apps": SNAPSHOT_INSTALLED_APPS,
+                                                  "max_items": DEBUG_LOG_MAX_ITEMS})
+            except Exception as e:
+                logger.error(f"Error requesting snapshot: {e}")
+
+    # _back_off and _over_budget expect the caller to hold self._lock.
+    def _back_off(self):
+        self.delay = min(self.delay * 2, self.max_interval)
+
+    def _over_budget(self) -> bool:
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= self.budget_window:
+            self._window_start = now
+            self._cpu_used = 0.0
+            self._io_used = 0
+            return False
+        return (self._cpu_used > self.cpu_budget * self.budget_window
+                or self._io_used >= self.io_budget)
+
+    def submit(self, appid: int, extra_data=None, unchanged: bool = False) -> dict:
+        """Log a snapshot unless it matches the previous one.
+
+        unchanged=True means the frontend already saw that its snapshot did not change and
+        sent no body; it is treated like a matching digest.
+        """
+        with self._lock:
+            self._awaiting = False
+            if unchanged:
+                self._back_off()
+                return {"written": False, "reason": "unchanged", "next_in": self.delay}
+            if self._over_budget():
+                return {"written": False, "reason": "budget"}
+        start = time.thread_time()
+        try:
+            extra_data, truncated = truncate_payload(extra_data)
+            digest = payload_digest([appid, extra_data])
+            with self._lock:
+                if digest == self._last_digest:
+                    self._back_off()
+                    return {"written": False, "reason": "unchanged", "next_in": self.delay}
+                self._last_digest = digest
+                self.delay = self.interval
+            summary = store_record(appid, extra_data, truncated)
+            with self._lock:
+                self._io_used += summary["bytes"]
+                return {"written": True, "record_id": summary["record_id"], "next_in": self.delay}
+        finally:
+            with self._lock:
+                self._cpu_used += time.thread_time() - start
+
 class Plugin:
+    snapshots = None
+    heroic_warmup = None
+
     @classmethod
     async def _main(cls):
         logger.info("[backend] Decky EnvTest loaded.")
+        cls.snapshots = SnapshotScheduler()
+        cls.snapshots.start()
+        # Warm the Heroic cache in the background so loading is not held up by disk IO.
+        cls.heroic_warmup = asyncio.get_running_loop().run_in_executor(None, heroic_cache.warm)
+        cls.heroic_warmup.add_done_callback(cls._log_warmup_error)
+
+    @staticmethod
+    def _log_warmup_error(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Error warming Heroic config cache: {future.exception()}")
 
     @classmethod
     async def _unload(cls):
+        if cls.snapshots is not None:
+            await cls.snapshots.stop()
+        close_store()
         logger.info("[backend] Decky EnvTest unloaded.")
 
+    @classmethod
+    async def submit_snapshot(cls, data):
+        try:
+            if cls.snapshots is None:
+                return {"status": "error", "message": "Snapshot scheduler not running"}
+            appid = data.get("appid", 0)
+            extra = data.get("additional", {})
+            unchanged = bool(data.get("unchanged", False))
+            # Hashing and writing happen off the event loop so Decky stays responsive.
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, cls.snapshots.submit, appid, extra, unchanged)
+            return {"status": "success", **result}
+        except Exception as e:
+            logger.error(f"Error in submit_snapshot: {e}")
+            return {"status": "error", "message": str(e)}
+
     @classmethod
     async def debug_log(cls, data):
         try:
             appid = data.get("appid", 0)
             extra = data.get("additional", {})
-            log_output = debug_log(appid, extra)
-            return {"status": "success", "log": log_output}
+            # The file store blocks on its lock while other writers append, so stay off the event loop.
+            summary = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(debug_log, appid, extra, full=bool(data.get("full", False))))
+            log_output = summary.pop("log", None)
+            response = {"status": "success", "record_id": summary["record_id"], "summary": summary}
+            if log_output is not None:
+                response["log"] = log_output
+            return response
         except Exception as e:
             logger.error(f"Error in debug_log: {e}")
             return {"status": "error", "message": str(e)}
 
+    @classmethod
+    async def query_records(cls, data):
+        try:
+            appid = data.get("appid")
+            since = data.get("since")
+            limit = int(data.get("limit", 50))
+            # File queries scan the daily logs, so keep them off the event loop.
+            records = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(query_debug_records, appid=appid, since=since, limit=limit))
+            return {"status": "success", "records": records}
+        except Exception as e:
+            logger.error(f"Error in query_records: {e}")
+            return {"status": "error", "message": str(e)}
+
     @classmethod
     async def pull_heroic_data(cls, data):
         try:
@@ -119,3 +808,20 @@ class Plugin:
         except Exception as e:
             logger.error(f"Error in pull_heroic_data: {e}")
             return {"status": "error", "message": str(e)}
+
+    @classmethod
+    async def warm_heroic_cache(cls, data=None):
+        try:
+            stats = await asyncio.get_running_loop().run_in_executor(None, heroic_cache.warm)
+            return {"status": "success", "stats": stats}
+        except Exception as e:
+            logger.error(f"Error in warm_heroic_cache: {e}")
+            return {"status": "error", "message": str(e)}
+
+    @classmethod
+    async def heroic_cache_stats(cls, data=None):
+        try:
+            return {"status": "success", "stats": heroic_cache.stats()}
+        except Exception as e:
+            logger.error(f"Error in heroic_cache_stats: {e}")
+            return {"status": "error", "message": str(e)}
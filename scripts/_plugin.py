@@ -0,0 +1,34 @@
+"""Load the backend (main.py) outside Decky for the scripts in this directory."""
+
+import os
+import sys
+import types
+import logging
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_backend(log_dir: str):
+    """Import main.py with its log dir pointed at log_dir.
+
+    Inside Decky the loader provides the `decky` module; when it is missing a minimal
+    stand-in with a logger and a no-op emit is registered so the backend can import.
+    """
+    os.environ["DECKY_PLUGIN_LOG_DIR"] = log_dir
+    try:
+        import decky  # noqa: F401
+    except ImportError:
+        decky = types.ModuleType("decky")
+        decky.logger = logging.getLogger("envtest")
+
+        async def emit(event, *args):
+            pass
+
+        decky.emit = emit
+        sys.modules["decky"] = decky
+    decky_logger = sys.modules["decky"].logger
+    decky_logger.disabled = True
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import main
+    return main
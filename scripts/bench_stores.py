@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Compare write throughput and query latency of the debug record stores.
+
+    python scripts/bench_stores.py [--records N] [--items N] [--queries N]
+
+Each store writes N records (spread over 10 appids) into a fresh temp dir, then answers
+appid-filtered queries for the newest 50 records; the median and p95 latency are reported.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+from _plugin import load_backend
+
+
+def make_payload(items: int) -> dict:
+    return {
+        "GetAppDetails": {"strDisplayName": "Bench Game", "bIsInstalled": True},
+        "InstalledApps": [{"appid": i, "name": f"App {i}"} for i in range(items)],
+        "GameVersion": "1.0.0",
+    }
+
+
+def bench(main, store_cls, log_dir: str, records: int, payload: dict, queries: int) -> dict:
+    main.LOG_DIR = log_dir
+    kwargs = {"path": os.path.join(log_dir, "records.sqlite3")} if store_cls is main.SqliteStore else {}
+    if store_cls is main.MemoryStore:
+        kwargs = {"size": records}
+    store = store_cls(**kwargs)
+    try:
+        start = time.perf_counter()
+        for i in range(records):
+            store.write(main.collect_debug_data(i % 10, payload))
+        store.flush()
+        write_seconds = time.perf_counter() - start
+
+        latencies = []
+        for i in range(queries):
+            start = time.perf_counter()
+            store.query(appid=i % 10, limit=50)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        store.close()
+    latencies.sort()
+    return {
+        "writes_per_sec": records / write_seconds,
+        "query_median_ms": statistics.median(latencies) * 1000,
+        "query_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000, help="records written per store")
+    parser.add_argument("--items", type=int, default=50, help="InstalledApps entries per record")
+    parser.add_argument("--queries", type=int, default=50, help="queries timed per store")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        main = load_backend(root)
+        payload = make_payload(args.items)
+        print(f"{args.records} records, {args.items} InstalledApps entries each, {args.queries} queries")
+        print(f"{'store':<8} {'writes/s':>10} {'query p50 ms':>13} {'query p95 ms':>13}")
+        for name, store_cls in main.STORES.items():
+            log_dir = tempfile.mkdtemp(dir=root)
+            result = bench(main, store_cls, log_dir, args.records, payload, args.queries)
+            print(f"{name:<8} {result['writes_per_sec']:>10.0f} "
+                  f"{result['query_median_ms']:>13.3f} {result['query_p95_ms']:>13.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
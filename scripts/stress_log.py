@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Stress concurrent appends to the daily log file.
+
+    python scripts/stress_log.py [--writers 1x1,2x2,4x4,8x4] [--records N] [--pad BYTES]
+
+For each PROCESSESxTHREADS combination every thread writes N records through debug_log into
+a fresh log dir. The log is then decoded strictly, record by record: any torn or interleaved
+record, missing record or damaged payload fails the run. Throughput is printed per writer count.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+from _plugin import load_backend
+
+
+def _write_records(main, writer: int, records: int, pad: str):
+    for i in range(records):
+        main.debug_log(writer, {"writer": writer, "seq": i, "pad": pad})
+
+
+def _process(log_dir: str, proc: int, threads: int, records: int, pad: str):
+    main = load_backend(log_dir)
+    workers = [threading.Thread(target=_write_records, args=(main, proc * 1000 + t, records, pad))
+               for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+
+def verify(log_dir: str, writers: list, records: int, pad: str) -> list:
+    """Return a list of problems found in the log dir (empty when every record is intact)."""
+    problems = []
+    seen = {w: [] for w in writers}
+    decoder = json.JSONDecoder()
+    for name in sorted(os.listdir(log_dir)):
+        if not name.startswith("log-"):
+            continue
+        with open(os.path.join(log_dir, name), "r", encoding="utf-8") as f:
+            text = f.read()
+        pos = 0
+        while pos < len(text):
+            if text[pos].isspace():
+                pos += 1
+                continue
+            try:
+                record, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                problems.append(f"{name}: torn record at offset {pos}: {e}")
+                break
+            info = record.get("game_info", {})
+            if info.get("pad") != pad or info.get("writer") not in seen:
+                problems.append(f"{name}: damaged record {record.get('record_id')}")
+                continue
+            seen[info["writer"]].append(info["seq"])
+    for writer, seqs in seen.items():
+        if sorted(seqs) != list(range(records)):
+            problems.append(f"writer {writer}: wrote {records} records, read back {len(seqs)}")
+    return problems
+
+
+def run(procs: int, threads: int, records: int, pad: str) -> bool:
+    with tempfile.TemporaryDirectory() as log_dir:
+        start = time.perf_counter()
+        workers = [multiprocessing.Process(target=_process, args=(log_dir, p, threads, records, pad))
+                   for p in range(procs)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        writers = [p * 1000 + t for p in range(procs) for t in range(threads)]
+        problems = verify(log_dir, writers, records, pad)
+    total = procs * threads * records
+    status = "ok" if not problems else f"FAILED ({len(problems)} problems)"
+    print(f"{procs:>2} proc x {threads:>2} thr = {procs * threads:>3} writers: "
+          f"{total:>6} records, {total / elapsed:>8.0f} rec/s, {status}")
+    for problem in problems[:10]:
+        print(f"    {problem}")
+    return not problems
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", default="1x1,2x2,4x4,8x4",
+                        help="comma-separated PROCESSESxTHREADS combinations")
+    parser.add_argument("--records", type=int, default=200, help="records per thread")
+    parser.add_argument("--pad", type=int, default=4096, help="payload padding per record in bytes")
+    args = parser.parse_args(argv)
+
+    pad = "x" * args.pad
+    ok = True
+    for combo in args.writers.split(","):
+        procs, threads = (int(n) for n in combo.lower().split("x"))
+        ok = run(procs, threads, args.records, pad) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
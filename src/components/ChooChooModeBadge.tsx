@@ -1,21 +1,7 @@
 import React, { useState } from "react";
 import { Navigation } from "@decky/ui";
 import { Backend } from "../utils/backend";
-
-// We only declare SteamClient here. Decky UI already defines 'appStore'.
-declare global {
-  interface Window {
-    SteamClient?: {
-      Apps?: {
-        GetAppDetails?: (appid: number) => any;
-        GetInstalledApps?: () => any[];
-        GetGameVersion?: (appid: number) => string;
-        GetGameActionStatus?: (appid: number) => any;
-      };
-    };
-  }
-}
-export {};
+import { getGameInfo } from "../utils/gameInfo";
 
 const PrettyJSON: React.FC<{ data: any }> = ({ data }) => {
   if (typeof data !== "object" || data === null) return <div>{String(data)}</div>;
@@ -33,33 +19,6 @@ const PrettyJSON: React.FC<{ data: any }> = ({ data }) => {
   );
 };
 
-async function getGameInfo(appid: number): Promise<any> {
-  let info: any = {};
-  try {
-    if (window.SteamClient && window.SteamClient.Apps) {
-      if (typeof window.SteamClient.Apps.GetAppDetails === "function") {
-        info.GetAppDetails = window.SteamClient.Apps.GetAppDetails(appid) || {};
-      }
-      if (typeof window.SteamClient.Apps.GetInstalledApps === "function") {
-        info.InstalledApps = window.SteamClient.Apps.GetInstalledApps() || [];
-      }
-      if (typeof window.SteamClient.Apps.GetGameVersion === "function") {
-        info.GameVersion = window.SteamClient.Apps.GetGameVersion(appid) || "Not available";
-      }
-      if (typeof window.SteamClient.Apps.GetGameActionStatus === "function") {
-        info.GameActionStatus = window.SteamClient.Apps.GetGameActionStatus(appid) || "Not available";
-      }
-    }
-    // Now we can directly reference window.appStore from the Decky UI definitions (no re-declaration needed).
-    if (window.appStore && typeof window.appStore.GetAppOverviewByAppID === "function") {
-      info.AppOverview = window.appStore.GetAppOverviewByAppID(appid) || {};
-    }
-  } catch (e: any) {
-    info.error = e.toString();
-  }
-  return info;
-}
-
 const ChooChooModeBadge: React.FC<{ appid: number; appName: string }> = ({ appid, appName }) => {
   const [flashing, setFlashing] = useState(false);
   const [logData, setLogData] = useState("");
@@ -71,7 +30,7 @@ const ChooChooModeBadge: React.FC<{ appid: number; appName: string }> = ({ appid
     setTimeout(() => setFlashing(false), 500);
     try {
       const gameInfo = await getGameInfo(appid);
-      const result = await Backend.debugLog(appid, gameInfo);
+      const result = await Backend.debugLog(appid, gameInfo, true);
       setLogData(result.log || "No log data returned");
       try {
         const parsed = JSON.parse(result.log || "{}");
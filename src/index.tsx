@@ -1,15 +1,51 @@
-import { definePlugin, staticClasses } from "@decky/ui";
+import { definePlugin, staticClasses, Router } from "@decky/ui";
 import { FaBug } from "react-icons/fa";
-import { routerHook } from "@decky/api";
+import { routerHook, addEventListener, removeEventListener } from "@decky/api";
 import PageRouter from "./views/PageRouter";
+import { Backend } from "./utils/backend";
+import { getGameInfo } from "./utils/gameInfo";
+
+// The backend asks for a snapshot periodically; only answer while a game is running.
+const SNAPSHOT_EVENT = "envtest_snapshot_request";
+
+interface SnapshotRequest {
+  installed_apps?: boolean;
+  max_items?: number;
+}
+
+// Last snapshot sent, so an unchanged one is reported without sending the body again.
+let lastSnapshot = "";
+
+const onSnapshotRequest = async (request?: SnapshotRequest) => {
+  const appid = Number(Router.MainRunningApp?.appid) || 0;
+  if (!appid) return;
+  try {
+    const gameInfo = await getGameInfo(appid, {
+      installedApps: request?.installed_apps ?? false,
+      maxItems: request?.max_items ?? 0
+    });
+    const snapshot = JSON.stringify([appid, gameInfo]);
+    if (snapshot === lastSnapshot) {
+      await Backend.submitSnapshot(appid, undefined, true);
+      return;
+    }
+    const result = await Backend.submitSnapshot(appid, gameInfo);
+    // A snapshot skipped for budget reasons was not stored, so it must be sent again.
+    if (result.written || result.reason === "unchanged") lastSnapshot = snapshot;
+  } catch (error) {
+    console.error("Error submitting snapshot:", error);
+  }
+};
 
 export default definePlugin(() => {
   routerHook.addRoute("/debug/:appid", PageRouter, { exact: true });
+  const snapshotListener = addEventListener(SNAPSHOT_EVENT, onSnapshotRequest);
   return {
     title: <div className={staticClasses.Title}>Decky EnvTest</div>,
     content: <PageRouter />,
     icon: <FaBug />,
     onDismount() {
+      removeEventListener(SNAPSHOT_EVENT, snapshotListener);
       routerHook.removeRoute("/debug/:appid");
     }
   };
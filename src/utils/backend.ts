@@ -1,15 +1,49 @@
 import { callable } from "@decky/api";
 
-const debugLog = callable<[ { appid: number, additional?: any } ], { status: string, log?: string }>("debug_log");
+export interface DebugLogSummary {
+  record_id: string;
+  timestamp: string;
+  appid: number;
+  keys: string[];
+  truncated: number;
+  bytes: number;
+}
+
+const debugLog = callable<[ { appid: number, additional?: any, full?: boolean } ], { status: string, record_id?: string, summary?: DebugLogSummary, log?: string, message?: string }>("debug_log");
 const pullHeroicData = callable<[ { appname: string } ], { status: string, data?: any, message?: string }>("pull_heroic_data");
+export interface HeroicCacheStats {
+  entries: number;
+  source_bytes: number;
+  warm_seconds: number | null;
+  warmed_at: string | null;
+  hits: number;
+  misses: number;
+}
+
+const warmHeroicCache = callable<[], { status: string, stats?: HeroicCacheStats, message?: string }>("warm_heroic_cache");
+const heroicCacheStats = callable<[], { status: string, stats?: HeroicCacheStats, message?: string }>("heroic_cache_stats");
+const queryRecords = callable<[ { appid?: number, since?: string, limit?: number } ], { status: string, records?: any[], message?: string }>("query_records");
+const submitSnapshot = callable<[ { appid: number, additional?: any, unchanged?: boolean } ], { status: string, written?: boolean, reason?: string, record_id?: string, next_in?: number, message?: string }>("submit_snapshot");
 
 export class Backend {
-  static async debugLog(appid: number, additional?: any): Promise<{ status: string, log?: string }> {
-    return await debugLog({ appid, additional });
+  static async debugLog(appid: number, additional?: any, full: boolean = false): Promise<{ status: string, record_id?: string, summary?: DebugLogSummary, log?: string, message?: string }> {
+    return await debugLog({ appid, additional, full });
   }
   static async pullHeroicData(appname: string): Promise<{ status: string, data?: any, message?: string }> {
     return await pullHeroicData({ appname });
   }
+  static async warmHeroicCache(): Promise<{ status: string, stats?: HeroicCacheStats, message?: string }> {
+    return await warmHeroicCache();
+  }
+  static async heroicCacheStats(): Promise<{ status: string, stats?: HeroicCacheStats, message?: string }> {
+    return await heroicCacheStats();
+  }
+  static async queryRecords(appid?: number, since?: string, limit?: number): Promise<{ status: string, records?: any[], message?: string }> {
+    return await queryRecords({ appid, since, limit });
+  }
+  static async submitSnapshot(appid: number, additional?: any, unchanged: boolean = false): Promise<{ status: string, written?: boolean, reason?: string, record_id?: string, next_in?: number, message?: string }> {
+    return await submitSnapshot({ appid, additional, unchanged });
+  }
 }
 
 export {};
@@ -0,0 +1,49 @@
+// We only declare SteamClient here. Decky UI already defines 'appStore'.
+declare global {
+  interface Window {
+    SteamClient?: {
+      Apps?: {
+        GetAppDetails?: (appid: number) => any;
+        GetInstalledApps?: () => any[];
+        GetGameVersion?: (appid: number) => string;
+        GetGameActionStatus?: (appid: number) => any;
+      };
+    };
+  }
+}
+
+export interface GameInfoOptions {
+  // Whether to call GetInstalledApps at all; it is the costly part of a snapshot.
+  installedApps?: boolean;
+  // Cap on InstalledApps entries; 0 keeps them all.
+  maxItems?: number;
+}
+
+export async function getGameInfo(appid: number, options: GameInfoOptions = {}): Promise<any> {
+  const { installedApps = true, maxItems = 0 } = options;
+  let info: any = {};
+  try {
+    if (window.SteamClient && window.SteamClient.Apps) {
+      if (typeof window.SteamClient.Apps.GetAppDetails === "function") {
+        info.GetAppDetails = window.SteamClient.Apps.GetAppDetails(appid) || {};
+      }
+      if (installedApps && typeof window.SteamClient.Apps.GetInstalledApps === "function") {
+        const apps = window.SteamClient.Apps.GetInstalledApps() || [];
+        info.InstalledApps = maxItems > 0 && apps.length > maxItems ? apps.slice(0, maxItems) : apps;
+      }
+      if (typeof window.SteamClient.Apps.GetGameVersion === "function") {
+        info.GameVersion = window.SteamClient.Apps.GetGameVersion(appid) || "Not available";
+      }
+      if (typeof window.SteamClient.Apps.GetGameActionStatus === "function") {
+        info.GameActionStatus = window.SteamClient.Apps.GetGameActionStatus(appid) || "Not available";
+      }
+    }
+    // Now we can directly reference window.appStore from the Decky UI definitions (no re-declaration needed).
+    if (window.appStore && typeof window.appStore.GetAppOverviewByAppID === "function") {
+      info.AppOverview = window.appStore.GetAppOverviewByAppID(appid) || {};
+    }
+  } catch (e: any) {
+    info.error = e.toString();
+  }
+  return info;
+}